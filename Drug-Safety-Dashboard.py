@@ -1,12 +1,19 @@
 import streamlit as st
 import pandas as pd
-import requests
+import numpy as np
+import httpx
+import orjson
+import diskcache
+import os
+import sqlite3
+import time
 import plotly.express as px
 import plotly.graph_objects as go
 import pydeck as pdk
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from datetime import datetime
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+import threading
 
 # ── Page Config ───────────────────────────────────────────────────────────────
 st.set_page_config(page_title="FDA Drug Safety Dashboard", layout="wide")
@@ -73,13 +80,14 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ── Constants ─────────────────────────────────────────────────────────────────
-DRUGS = {
+# Lookup tables are wrapped in MappingProxyType so they stay read-only
+DRUGS = MappingProxyType({
     "Ozempic (semaglutide)":     "semaglutide",
     "Humira (adalimumab)":       "adalimumab",
     "Keytruda (pembrolizumab)":  "pembrolizumab",
     "Eliquis (apixaban)":        "apixaban",
     "Jardiance (empagliflozin)": "empagliflozin",
-}
+})
 
 # These are administrative/process terms in FAERS — NOT clinical side effects.
 # We fetch 30 reactions and strip these so the chart only shows real symptoms.
@@ -96,8 +104,10 @@ NON_SIDE_EFFECTS = {
     "condition aggravated", "therapeutic response unexpected",
     "drug use for unknown indication",
 }
+# Title-cased to match the display form, so filtering needs no extra pass
+NON_SIDE_EFFECTS_TITLE = frozenset(s.title() for s in NON_SIDE_EFFECTS)
 
-ISO2_COORDS = {
+ISO2_COORDS = MappingProxyType({
     "US":(37.09,-95.71),"GB":(55.37,-3.43),"CA":(56.13,-106.34),"FR":(46.22,2.21),
     "DE":(51.16,10.45),"IT":(41.87,12.56),"ES":(40.46,-3.74),"JP":(36.20,138.25),
     "CN":(35.86,104.19),"IN":(20.59,78.96),"BR":(-14.23,-51.92),"AU":(-25.27,133.77),
@@ -109,16 +119,20 @@ ISO2_COORDS = {
     "IE":(53.41,-8.24),"GR":(39.07,21.82),"HU":(47.16,19.50),"CZ":(49.81,15.47),
     "RO":(45.94,24.96),"SA":(23.88,45.07),"MY":(4.21,101.97),
     "PH":(12.87,121.77),"NG":(9.08,8.67),"EG":(26.82,30.80),"UA":(48.37,31.16),
-}
+})
 
-ISO2_TO_NAME = {
+ISO2_TO_NAME = MappingProxyType({
     'US':'United States','GB':'United Kingdom','CA':'Canada','FR':'France',
     'DE':'Germany','JP':'Japan','AU':'Australia','IT':'Italy','ES':'Spain',
     'NL':'Netherlands','SE':'Sweden','CH':'Switzerland','BE':'Belgium',
     'CN':'China','IN':'India','BR':'Brazil','RU':'Russia','MX':'Mexico',
     'KR':'South Korea','TR':'Turkey','AR':'Argentina','PL':'Poland',
     'SG':'Singapore','IE':'Ireland','GR':'Greece','HU':'Hungary',
-}
+})
+
+# Lookup table joined against the country counts in get_geo
+COORDS_DF = pd.DataFrame.from_dict(ISO2_COORDS, orient="index", columns=["lat", "lon"])
+COORDS_DF["name"] = pd.Series(ISO2_TO_NAME).reindex(COORDS_DF.index).fillna(COORDS_DF.index.to_series())
 
 BASE = "https://api.fda.gov/drug/event.json"
 
@@ -129,39 +143,121 @@ RED        = "#dc2626"
 GREY_GRID  = "#f1f5f9"
 FONT_DARK  = "#1e293b"
 
-# ── Resilient Session ─────────────────────────────────────────────────────────
-def _session() -> requests.Session:
-    s = requests.Session()
-    retry = Retry(total=4, backoff_factor=1,
-                  status_forcelist=[500,502,503,504],
-                  allowed_methods=["GET"], raise_on_status=False)
-    adapter = HTTPAdapter(max_retries=retry)
-    s.mount("https://", adapter)
-    return s
+# ── Resilient Client ──────────────────────────────────────────────────────────
+# One HTTP/2 client shared by every script rerun and browser session. The
+# concurrent fetchers below multiplex over a single TLS connection (httpcore
+# queues requests on a pending HTTP/2 connection rather than opening more).
+# The pool itself is uncapped so an HTTP/1.1 fallback never blocks requests;
+# only the number of idle keep-alive connections is kept small.
+RETRY_STATUS = {500, 502, 503, 504}
+# ConnectError/ConnectTimeout are retried by the transport; only errors after
+# the connection is up are retried in _call, so the two layers don't multiply
+RETRY_ERRORS = (httpx.ReadTimeout, httpx.WriteTimeout, httpx.PoolTimeout,
+                httpx.ReadError, httpx.RemoteProtocolError)
+RETRIES      = 4
+MAX_IDLE     = 3
+
+@st.cache_resource
+def _client() -> httpx.Client:
+    return httpx.Client(
+        timeout=20,
+        transport=httpx.HTTPTransport(
+            http2=True, retries=RETRIES,
+            limits=httpx.Limits(max_connections=None,
+                                max_keepalive_connections=MAX_IDLE),
+        ),
+    )
+
+# ── Disk Cache ────────────────────────────────────────────────────────────────
+# st.cache_data drops TTL when persist="disk" is set, so successful responses
+# are kept in a diskcache with the same 10 min expiry so they survive restarts.
+# diskcache is SQLite-backed: FDA_CACHE_DIR must be on a local disk, not NFS.
+# The cache is only a speed-up — any failure in it is treated as a miss.
+CACHE_TTL = 600
+CACHE_ERRORS = (OSError, sqlite3.Error, diskcache.Timeout)
+
+@st.cache_resource
+def _disk_cache() -> diskcache.Cache:
+    # Errors propagate so cache_resource doesn't memoise a failed open;
+    # the next call tries again
+    return diskcache.Cache(os.environ.get("FDA_CACHE_DIR", ".cache/openfda"))
+
+def _cache_get(key):
+    try:
+        return _disk_cache().get(key)
+    except CACHE_ERRORS:
+        return None
+
+def _cache_set(key, value, expire: int | None = None) -> None:
+    try:
+        _disk_cache().set(key, value, expire=expire)
+    except CACHE_ERRORS:
+        pass
 
-SESSION = _session()
+def _backoff(attempt: int, r: httpx.Response | None = None) -> float:
+    # Honour a numeric Retry-After (e.g. on 503), otherwise 1s → 2s → 4s → 8s
+    retry_after = r.headers.get("Retry-After", "") if r is not None else ""
+    return min(int(retry_after), 30) if retry_after.isdigit() else 2 ** attempt
 
 def _call(params: dict) -> tuple[list, str | None]:
+    key = tuple(sorted(params.items()))
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached, None
+    # Once the TTL lapses, revalidate with the last ETag/Last-Modified so an
+    # unchanged aggregation comes back as a bodyless 304
+    validator = _cache_get(("validator", key))
+    headers = {}
+    if validator:
+        etag, last_modified, _ = validator
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
     try:
-        r = SESSION.get(BASE, params=params, timeout=20)
-        if r.status_code == 200:
-            return r.json().get("results", []), None
+        # Back off and retry on server errors, timeouts and dropped connections
+        for attempt in range(RETRIES + 1):
+            try:
+                r = _client().get(BASE, params=params, headers=headers)
+            except RETRY_ERRORS:
+                if attempt == RETRIES:
+                    raise
+                time.sleep(_backoff(attempt))
+                continue
+            if r.status_code not in RETRY_STATUS or attempt == RETRIES:
+                break
+            time.sleep(_backoff(attempt, r))
+        if r.status_code == 304 and validator:
+            results = validator[2]
+            _cache_set(key, results, expire=CACHE_TTL)
+            return results, None
+        elif r.status_code == 200:
+            results = orjson.loads(r.content).get("results", [])
+            _cache_set(key, results, expire=CACHE_TTL)
+            etag, last_modified = r.headers.get("ETag"), r.headers.get("Last-Modified")
+            if etag or last_modified:
+                _cache_set(("validator", key), (etag, last_modified, results))
+            return results, None
         elif r.status_code == 404:
             return [], "no_data"
         else:
             return [], f"server_error_{r.status_code}"
-    except requests.RequestException as e:
+    except orjson.JSONDecodeError as e:
+        return [], f"decode_error: {e}"
+    except httpx.HTTPError as e:
         return [], f"network_error: {e}"
 
-def _q(term: str) -> str:
-    return f'patient.drug.medicinalproduct:"{term.upper()}"'
+# Search clause per drug, built once instead of on every fetch
+QUERY = MappingProxyType({
+    t: f'patient.drug.medicinalproduct:"{t.upper()}"' for t in DRUGS.values()
+})
 
 # ── Data Fetchers ─────────────────────────────────────────────────────────────
-@st.cache_data(ttl=600, show_spinner=False)
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def get_reactions(term: str) -> tuple[pd.DataFrame, str | None]:
     # Fetch 30 so we still have 5 real ones after stripping admin/process terms
     data, err = _call({
-        "search": _q(term),
+        "search": QUERY[term],
         "count": "patient.reaction.reactionmeddrapt.exact",
         "limit": 30
     })
@@ -170,52 +266,73 @@ def get_reactions(term: str) -> tuple[pd.DataFrame, str | None]:
     df = pd.DataFrame(data).rename(columns={"term": "Reaction", "count": "Reports"})
     df["Reaction"] = df["Reaction"].str.title()
     # Filter out non-clinical terms
-    mask = ~df["Reaction"].str.lower().isin(NON_SIDE_EFFECTS)
-    df = df[mask].head(8).reset_index(drop=True)
+    df = df[~df["Reaction"].isin(NON_SIDE_EFFECTS_TITLE)].head(8).reset_index(drop=True)
     return df, None
 
-@st.cache_data(ttl=600, show_spinner=False)
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def get_timeline(term: str) -> tuple[pd.DataFrame, str | None]:
-    data, err = _call({"search": _q(term), "limit": 1000})
+    # Server-side aggregation: one row per receive date instead of raw records
+    data, err = _call({"search": QUERY[term], "count": "receivedate"})
     if err or not data:
         return pd.DataFrame(columns=["Year", "Reports"]), err
-    rows = []
-    for record in data:
-        try:
-            raw_date = record.get("receivedate", "")
-            if len(raw_date) == 8:
-                year = int(raw_date[:4])
-                if 2000 <= year <= datetime.now().year:
-                    rows.append(year)
-        except (ValueError, TypeError):
-            continue
-    if not rows:
+    df = pd.DataFrame(data)
+    df["Year"] = pd.to_datetime(df["time"], format="%Y%m%d", errors="coerce").dt.year
+    df = df[df["Year"].between(2000, datetime.now().year)]
+    if df.empty:
         return pd.DataFrame(columns=["Year", "Reports"]), "no_data"
-    df = pd.Series(rows).value_counts().sort_index().reset_index()
-    df.columns = ["Year", "Reports"]
+    df = (df.astype({"Year": "int16"}).groupby("Year")["count"].sum()
+            .reset_index(name="Reports"))
     return df, None
 
-@st.cache_data(ttl=600, show_spinner=False)
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
 def get_geo(term: str) -> tuple[pd.DataFrame, str | None]:
-    data, err = _call({"search": _q(term), "count": "occurcountry.exact", "limit": 50})
+    data, err = _call({"search": QUERY[term], "count": "occurcountry.exact", "limit": 50})
     if err or not data:
         return pd.DataFrame(columns=["country","name","Reports","lat","lon"]), err
-    rows = []
-    for item in data:
-        iso2   = item.get("term", "").upper()
-        count  = item.get("count", 0)
-        coords = ISO2_COORDS.get(iso2)
-        if coords:
-            rows.append({
-                "country": iso2,
-                "name": ISO2_TO_NAME.get(iso2, iso2),
-                "Reports": count,
-                "lat": coords[0],
-                "lon": coords[1],
-            })
-    if not rows:
+    df = pd.DataFrame(data).rename(columns={"term": "country", "count": "Reports"})
+    df["country"] = df["country"].str.upper()
+    df = df.merge(COORDS_DF, left_on="country", right_index=True)
+    if df.empty:
         return pd.DataFrame(columns=["country","name","Reports","lat","lon"]), "no_data"
-    return pd.DataFrame(rows), None
+    return df[["country","name","Reports","lat","lon"]].reset_index(drop=True), None
+
+# ── Chart Builders ────────────────────────────────────────────────────────────
+# Cached on the input frame, so reruns that keep the same drug reuse the figure
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def build_reactions_fig(df_react: pd.DataFrame) -> dict:
+    df_sorted = df_react.sort_values("Reports", ascending=True)
+    # Colour gradient: darkest = most reports
+    max_r = df_sorted["Reports"].max()
+    colours = [
+        f"rgba(220,38,38,{0.4 + 0.6*(v/max_r):.2f})"
+        for v in df_sorted["Reports"]
+    ]
+
+    fig_bar = go.Figure(go.Bar(
+        x=df_sorted["Reports"],
+        y=df_sorted["Reaction"],
+        orientation="h",
+        marker_color=colours,
+        text=df_sorted["Reports"].map("{:,}".format),
+        textposition="outside",
+        textfont=dict(size=11, color=FONT_DARK),
+        hovertemplate="<b>%{y}</b><br>Reports: %{x:,}<extra></extra>",
+    ))
+    fig_bar.update_layout(
+        paper_bgcolor="white", plot_bgcolor="white",
+        height=360,
+        margin=dict(l=10, r=70, t=10, b=10),
+        xaxis=dict(
+            showgrid=True, gridcolor=GREY_GRID, zeroline=False,
+            tickfont=dict(size=11, color="#6b7280"), title="Reports",
+        ),
+        yaxis=dict(
+            showgrid=False, zeroline=False,
+            tickfont=dict(size=12, color=FONT_DARK), title=None,
+        ),
+        hovermode="y unified",
+    )
+    return fig_bar.to_dict()
 
 # ── Sidebar ───────────────────────────────────────────────────────────────────
 with st.sidebar:
@@ -234,10 +351,41 @@ with st.sidebar:
 drug_term = DRUGS[drug_label]
 
 # ── Fetch ─────────────────────────────────────────────────────────────────────
+# The three requests are independent, so issue them concurrently
 with st.spinner(f"Loading FDA data for {drug_label}..."):
-    df_react, err_react = get_reactions(drug_term)
-    df_time,  err_time  = get_timeline(drug_term)
-    df_geo,   err_geo   = get_geo(drug_term)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        fut_react = pool.submit(get_reactions, drug_term)
+        fut_time  = pool.submit(get_timeline, drug_term)
+        fut_geo   = pool.submit(get_geo, drug_term)
+        df_react, err_react = fut_react.result()
+        df_time,  err_time  = fut_time.result()
+        df_geo,   err_geo   = fut_geo.result()
+
+# Warm the cache for every drug so switching the dropdown is instant
+def _prefetch(terms: list[str]) -> None:
+    for term in terms:
+        for fetch in (get_reactions, get_timeline, get_geo):
+            _, err = fetch(term)
+            # Don't leave a transient failure cached for a drug nobody asked for
+            if err and err != "no_data":
+                fetch.clear(term)
+
+# The fetch cache is process-wide, so the warm-up runs once per process per
+# TTL window — the next rerun after expiry re-warms it and retries failures
+@st.cache_resource(ttl=CACHE_TTL)
+def _start_prefetch() -> threading.Thread:
+    t = threading.Thread(target=_prefetch, args=(list(DRUGS.values()),), daemon=True)
+    t.start()
+    return t
+
+_start_prefetch()
+
+# Geo aggregates shared by the KPI card, map and insight
+if not df_geo.empty:
+    geo_reports = df_geo["Reports"].to_numpy()
+    geo_total   = geo_reports.sum()
+    geo_max     = geo_reports.max()
+    top_row     = df_geo.iloc[int(geo_reports.argmax())]
 
 def _show_err(err, label):
     if err == "no_data":
@@ -257,14 +405,18 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # ── KPI Cards ─────────────────────────────────────────────────────────────────
 total_reports = f"{int(df_time['Reports'].sum()):,}" if not df_time.empty else "—"
 top_reaction  = str(df_react.iloc[0]["Reaction"]) if not df_react.empty else "—"
-top_country   = df_geo.sort_values("Reports", ascending=False).iloc[0]["name"] if not df_geo.empty else "—"
-
-# Peak year for trend arrow
-if not df_time.empty and len(df_time) >= 2:
-    last_two = df_time.sort_values("Year").tail(2)["Reports"].values
+top_country   = top_row["name"] if not df_geo.empty else "—"
+
+# Trend arrow from the last two complete years — the current year is partial
+complete = df_time[df_time["Year"] < datetime.now().year].sort_values("Year")
+has_trend = len(complete) >= 2
+if has_trend:
+    last_two = complete.tail(2)
+    last_yr  = int(last_two["Year"].iloc[-1])
+    last_two = last_two["Reports"].values
     trend_arrow = "↑" if last_two[-1] > last_two[-2] else "↓"
     trend_color = "#16a34a" if last_two[-1] > last_two[-2] else "#dc2626"
-    trend_html  = f'<span style="color:{trend_color};font-size:0.8rem">{trend_arrow} vs prior year</span>'
+    trend_html  = f'<span style="color:{trend_color};font-size:0.8rem">{trend_arrow} {last_yr} vs {last_yr - 1}</span>'
 else:
     trend_html = ""
 
@@ -272,9 +424,9 @@ k1, k2, k3 = st.columns(3)
 with k1:
     st.markdown(f"""
     <div class="kpi-card">
-        <div class="kpi-label">Total Reports (sample)</div>
+        <div class="kpi-label">Total Reports</div>
         <div class="kpi-value">{total_reports}</div>
-        <div class="kpi-sub">Most recent 1,000 records · {trend_html}</div>
+        <div class="kpi-sub">All FAERS submissions since 2000 · {trend_html}</div>
     </div>""", unsafe_allow_html=True)
 with k2:
     st.markdown(f"""
@@ -295,67 +447,25 @@ st.markdown("<br>", unsafe_allow_html=True)
 
 # ── Chart 1: Timeline ─────────────────────────────────────────────────────────
 st.markdown('<div class="section-title">📅 Adverse Event Reports Over Time</div>', unsafe_allow_html=True)
-st.markdown('<div class="section-sub">Yearly count from the most recent 1,000 FAERS submissions</div>', unsafe_allow_html=True)
+st.markdown('<div class="section-sub">Yearly count of all FAERS submissions since 2000</div>', unsafe_allow_html=True)
 _show_err(err_time, "Timeline")
 
 if not df_time.empty:
-    # Add a trend line via scatter on top of bars
-    fig_time = go.Figure()
-
-    # Bars
-    fig_time.add_trace(go.Bar(
-        x=df_time["Year"].astype(str),
-        y=df_time["Reports"],
-        marker_color=BLUE,
-        marker_opacity=0.85,
-        name="Reports",
-        text=df_time["Reports"].apply(lambda x: f"{x:,}"),
-        textposition="outside",
-        textfont=dict(size=11, color=FONT_DARK),
-        hovertemplate="<b>%{x}</b><br>Reports: %{y:,}<extra></extra>",
-    ))
-
-    # Trend line
-    fig_time.add_trace(go.Scatter(
-        x=df_time["Year"].astype(str),
-        y=df_time["Reports"],
-        mode="lines+markers",
-        line=dict(color="#f59e0b", width=2.5, dash="dot"),
-        marker=dict(size=7, color="#f59e0b"),
-        name="Trend",
-        hoverinfo="skip",
-    ))
-
-    fig_time.update_layout(
-        paper_bgcolor="white", plot_bgcolor="white",
-        height=340,
-        margin=dict(l=20, r=20, t=30, b=20),
-        xaxis=dict(
-            showgrid=False, zeroline=False,
-            tickfont=dict(size=12, color="#374151"),
-            title=None,
-        ),
-        yaxis=dict(
-            showgrid=True, gridcolor=GREY_GRID, zeroline=False,
-            tickfont=dict(size=11, color="#6b7280"),
-            title=dict(text="Reports", font=dict(size=12, color="#6b7280")),
-        ),
-        legend=dict(
-            orientation="h", y=1.05, x=1, xanchor="right",
-            font=dict(size=11),
-        ),
-        bargap=0.35,
-        hovermode="x unified",
+    # Native Vega-Lite chart — far lighter to build and ship than a Plotly figure.
+    # Years are cast to str so the x-axis is categorical, not "2,021"
+    st.bar_chart(
+        df_time.set_index(df_time["Year"].astype(str))["Reports"],
+        color=BLUE, height=340,
     )
-    st.plotly_chart(fig_time, use_container_width=True)
 
-    if len(df_time) >= 2:
-        peak_yr  = int(df_time.loc[df_time["Reports"].idxmax(), "Year"])
-        peak_val = int(df_time["Reports"].max())
+    if has_trend:
+        peak_yr  = int(complete.loc[complete["Reports"].idxmax(), "Year"])
+        peak_val = int(complete["Reports"].max())
         direction = "rising 📈" if last_two[-1] > last_two[-2] else "declining 📉"
         st.markdown(
             f'<div class="insight">💡 <b>Insight:</b> Reports peaked in <b>{peak_yr}</b> '
-            f'({peak_val:,} submissions). Volume is currently <b>{direction}</b>. '
+            f'({peak_val:,} submissions). Volume was <b>{direction}</b> in {last_yr}, '
+            f'the latest complete year ({datetime.now().year} is still in progress). '
             f'Spikes often correspond to new market launches, media coverage, or safety label updates.</div>',
             unsafe_allow_html=True
         )
@@ -371,39 +481,7 @@ with col1:
     _show_err(err_react, "Reactions")
 
     if not df_react.empty:
-        df_sorted = df_react.sort_values("Reports", ascending=True)
-        # Colour gradient: darkest = most reports
-        max_r = df_sorted["Reports"].max()
-        colours = [
-            f"rgba(220,38,38,{0.4 + 0.6*(v/max_r):.2f})"
-            for v in df_sorted["Reports"]
-        ]
-
-        fig_bar = go.Figure(go.Bar(
-            x=df_sorted["Reports"],
-            y=df_sorted["Reaction"],
-            orientation="h",
-            marker_color=colours,
-            text=df_sorted["Reports"].apply(lambda x: f"{x:,}"),
-            textposition="outside",
-            textfont=dict(size=11, color=FONT_DARK),
-            hovertemplate="<b>%{y}</b><br>Reports: %{x:,}<extra></extra>",
-        ))
-        fig_bar.update_layout(
-            paper_bgcolor="white", plot_bgcolor="white",
-            height=360,
-            margin=dict(l=10, r=70, t=10, b=10),
-            xaxis=dict(
-                showgrid=True, gridcolor=GREY_GRID, zeroline=False,
-                tickfont=dict(size=11, color="#6b7280"), title="Reports",
-            ),
-            yaxis=dict(
-                showgrid=False, zeroline=False,
-                tickfont=dict(size=12, color=FONT_DARK), title=None,
-            ),
-            hovermode="y unified",
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.plotly_chart(build_reactions_fig(df_react), use_container_width=True)
         top5 = df_react.iloc[0]["Reaction"]
         st.markdown(
             f'<div class="insight">💡 <b>Insight:</b> <b>{top5}</b> is the most reported '
@@ -418,13 +496,16 @@ with col2:
     _show_err(err_geo, "Geography")
 
     if not df_geo.empty:
-        max_r = df_geo["Reports"].max()
-        df_geo["radius"] = (df_geo["Reports"] / max_r * 700_000).clip(lower=60_000)
-        df_geo["alpha"]  = ((df_geo["Reports"] / max_r) * 200 + 55).astype(int)
+        ratio = geo_reports / geo_max
+        df_geo["radius"] = np.maximum(ratio * 700_000, 60_000).astype(np.int32)
+        df_geo["alpha"]  = (ratio * 200 + 55).astype(np.int16)
 
+        # pydeck ships the layer data as JSON: send only the columns the layer
+        # and tooltip read (radius is an int above, not a long float literal)
+        layer_data = df_geo[["name", "Reports", "lat", "lon", "radius", "alpha"]]
         layer = pdk.Layer(
             "ScatterplotLayer",
-            data=df_geo,
+            data=layer_data,
             get_position=["lon", "lat"],
             get_radius="radius",
             get_fill_color=["alpha", 80, 200, "alpha"],
@@ -446,8 +527,7 @@ with col2:
             map_style="light",
         ), height=340)
 
-        top_row = df_geo.sort_values("Reports", ascending=False).iloc[0]
-        pct = top_row["Reports"] / df_geo["Reports"].sum() * 100
+        pct = top_row["Reports"] / geo_total * 100
         st.markdown(
             f'<div class="insight">💡 <b>Insight:</b> <b>{top_row["name"]}</b> accounts for '
             f'~<b>{pct:.0f}%</b> of all mapped reports. US dominance is expected — '